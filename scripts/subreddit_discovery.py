@@ -9,12 +9,32 @@ import json
 import os
 from datetime import datetime, timezone
 from collections import defaultdict, Counter
+import heapq
 import re
 from dotenv import load_dotenv
 
+# orjson is optional - it writes reports considerably faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
+# Confidence assigned to a related subreddit depending on where it was found
+SOURCE_CONFIDENCE = {
+    'sidebar': 0.7,
+    'post_mention': 0.5
+}
+
+# Matches r/subreddit mentions in free text
+SUBREDDIT_MENTION_RE = re.compile(r'r/([A-Za-z0-9_]+)')
+
+# Generic r/ words that are never real subreddit recommendations
+IGNORED_SUBREDDIT_NAMES = frozenset({'reddit', 'subreddit', 'moderator'})
+
 class SubredditDiscovery:
     def __init__(self):
         """Initialize Reddit API connection"""
@@ -29,6 +49,9 @@ class SubredditDiscovery:
         """Find subreddits related to user's activity"""
         print(f"🔍 Discovering related subreddits for {len(user_subreddits)} active subreddits...")
         
+        # Normalize names once; all scoring below works on lowercase names
+        user_subreddits = tuple(s.lower() for s in user_subreddits)
+        excluded = IGNORED_SUBREDDIT_NAMES.union(user_subreddits)
         related_subreddits = []
         
         for subreddit_name in user_subreddits:
@@ -36,11 +59,11 @@ class SubredditDiscovery:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
                 # Get related subreddits from sidebar/about
-                related = self._extract_related_from_sidebar(subreddit)
+                related = self._extract_related_from_sidebar(subreddit, excluded)
                 related_subreddits.extend(related)
                 
                 # Get subreddits mentioned in posts
-                mentioned = self._extract_mentioned_subreddits(subreddit, limit=20)
+                mentioned = self._extract_mentioned_subreddits(subreddit, limit=20, excluded=excluded)
                 related_subreddits.extend(mentioned)
                 
             except Exception as e:
@@ -52,25 +75,23 @@ class SubredditDiscovery:
         
         return scored_subreddits
     
-    def _extract_related_from_sidebar(self, subreddit):
-        """Extract related subreddits from sidebar/about section"""
+    def _extract_related_from_sidebar(self, subreddit, excluded=IGNORED_SUBREDDIT_NAMES):
+        """Extract related subreddits from sidebar/about section, skipping lowercase names in excluded"""
         related = []
         
         try:
-            # Get subreddit description and sidebar
+            # Sidebar text (PRAW exposes it as the subreddit description)
             description = subreddit.description or ""
-            sidebar = subreddit.description or ""
             
             # Look for r/subreddit patterns
-            subreddit_pattern = r'r/([A-Za-z0-9_]+)'
-            matches = re.findall(subreddit_pattern, description + " " + sidebar)
+            matches = SUBREDDIT_MENTION_RE.findall(description)
             
             for match in matches:
-                if match.lower() not in ['reddit', 'subreddit', 'moderator']:
+                if match.lower() not in excluded:
                     related.append({
                         'name': match,
                         'source': 'sidebar',
-                        'confidence': 0.7
+                        'confidence': SOURCE_CONFIDENCE['sidebar']
                     })
         
         except Exception as e:
@@ -78,8 +99,8 @@ class SubredditDiscovery:
         
         return related
     
-    def _extract_mentioned_subreddits(self, subreddit, limit=20):
-        """Extract subreddits mentioned in recent posts"""
+    def _extract_mentioned_subreddits(self, subreddit, limit=20, excluded=IGNORED_SUBREDDIT_NAMES):
+        """Extract subreddits mentioned in recent posts, skipping lowercase names in excluded"""
         mentioned = []
         
         try:
@@ -88,15 +109,14 @@ class SubredditDiscovery:
                 text = (submission.title or "") + " " + (submission.selftext or "")
                 
                 # Look for r/subreddit patterns
-                subreddit_pattern = r'r/([A-Za-z0-9_]+)'
-                matches = re.findall(subreddit_pattern, text)
+                matches = SUBREDDIT_MENTION_RE.findall(text)
                 
                 for match in matches:
-                    if match.lower() not in ['reddit', 'subreddit', 'moderator']:
+                    if match.lower() not in excluded:
                         mentioned.append({
                             'name': match,
                             'source': 'post_mention',
-                            'confidence': 0.5
+                            'confidence': SOURCE_CONFIDENCE['post_mention']
                         })
         
         except Exception as e:
@@ -105,16 +125,21 @@ class SubredditDiscovery:
         return mentioned
     
     def _score_related_subreddits(self, related_subreddits, user_subreddits):
-        """Score and rank related subreddits"""
+        """Score and rank related subreddits (user_subreddits must be lowercase)"""
         subreddit_scores = defaultdict(float)
         subreddit_sources = defaultdict(list)
+        excluded = IGNORED_SUBREDDIT_NAMES.union(user_subreddits)
+        user_keywords = self._extract_keywords_from_subreddits(user_subreddits)
         
-        # Count occurrences and sources
-        for sub in related_subreddits:
-            name = sub['name'].lower()
-            if name not in [s.lower() for s in user_subreddits]:  # Exclude user's current subreddits
-                subreddit_scores[name] += sub['confidence']
-                subreddit_sources[name].append(sub['source'])
+        # Count occurrences per (name, source) - confidence is fixed per source
+        source_counts = Counter(
+            (sub['name'].lower(), sub['source'])
+            for sub in related_subreddits
+            if sub['name'].lower() not in excluded  # Exclude user's current subreddits
+        )
+        for (name, source), count in source_counts.items():
+            subreddit_scores[name] += SOURCE_CONFIDENCE[source] * count
+            subreddit_sources[name].extend([source] * count)
         
         # Get subreddit metadata and calculate final scores
         scored_subreddits = []
@@ -123,57 +148,66 @@ class SubredditDiscovery:
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
+                # Read each lazy PRAW attribute exactly once
+                display_name = subreddit.display_name
+                subscribers = subreddit.subscribers or 0
+                description = subreddit.description or ""
+                public_description = subreddit.public_description or ""
+                subreddit_type = subreddit.subreddit_type
+                over18 = subreddit.over18
+                
                 # Calculate relevance score
-                relevance_score = self._calculate_relevance_score(subreddit, user_subreddits)
+                keyword_matches = self._count_keyword_matches(description, user_keywords)
+                relevance_score = self._calculate_relevance_score(subscribers, subreddit_type, over18, keyword_matches)
                 final_score = score * relevance_score
                 
                 scored_subreddits.append({
                     'name': subreddit_name,
-                    'display_name': subreddit.display_name,
-                    'subscribers': subreddit.subscribers,
-                    'description': subreddit.description[:200] + '...' if len(subreddit.description) > 200 else subreddit.description,
-                    'public_description': subreddit.public_description[:100] + '...' if len(subreddit.public_description) > 100 else subreddit.public_description,
-                    'subreddit_type': subreddit.subreddit_type,
-                    'over18': subreddit.over18,
+                    'display_name': display_name,
+                    'subscribers': subscribers,
+                    'description': description[:200] + '...' if len(description) > 200 else description,
+                    'public_description': public_description[:100] + '...' if len(public_description) > 100 else public_description,
+                    'subreddit_type': subreddit_type,
+                    'over18': over18,
                     'score': final_score,
                     'sources': subreddit_sources[subreddit_name],
-                    'relevance_factors': self._get_relevance_factors(subreddit, user_subreddits)
+                    'relevance_factors': self._get_relevance_factors(subscribers, subreddit_type, keyword_matches)
                 })
                 
             except Exception as e:
                 print(f"⚠️  Could not analyze r/{subreddit_name}: {e}")
                 continue
         
-        # Sort by score and return top results
-        scored_subreddits.sort(key=lambda x: x['score'], reverse=True)
-        return scored_subreddits[:30]  # Return top 30
+        # Return top 30 by score
+        return heapq.nlargest(30, scored_subreddits, key=lambda x: x['score'])
     
-    def _calculate_relevance_score(self, subreddit, user_subreddits):
+    def _count_keyword_matches(self, description, user_keywords):
+        """Count user keywords that appear in a subreddit description"""
+        description = description.lower()
+        return sum(1 for keyword in user_keywords if keyword in description)
+    
+    def _calculate_relevance_score(self, subscribers, subreddit_type, over18, keyword_matches):
         """Calculate relevance score based on various factors"""
         score = 1.0
         
         # Factor 1: Subscriber count (prefer active communities)
-        if subreddit.subscribers > 10000:
+        if subscribers > 10000:
             score *= 1.2
-        elif subreddit.subscribers < 1000:
+        elif subscribers < 1000:
             score *= 0.8
         
         # Factor 2: Subreddit type (prefer public communities)
-        if subreddit.subreddit_type == 'public':
+        if subreddit_type == 'public':
             score *= 1.1
-        elif subreddit.subreddit_type == 'private':
+        elif subreddit_type == 'private':
             score *= 0.7
         
-        # Factor 3: Content similarity (analyze description)
-        description = (subreddit.description or "").lower()
-        user_keywords = self._extract_keywords_from_subreddits(user_subreddits)
-        
-        keyword_matches = sum(1 for keyword in user_keywords if keyword in description)
+        # Factor 3: Content similarity (user keywords found in description)
         if keyword_matches > 0:
             score *= (1 + keyword_matches * 0.1)
         
         # Factor 4: Avoid NSFW unless user is in NSFW communities
-        if subreddit.over18:
+        if over18:
             score *= 0.5
         
         return score
@@ -189,24 +223,15 @@ class SubredditDiscovery:
         
         return list(keywords)
     
-    def _get_relevance_factors(self, subreddit, user_subreddits):
+    def _get_relevance_factors(self, subscribers, subreddit_type, keyword_matches):
         """Get detailed relevance factors for a subreddit"""
-        factors = {
-            'keyword_matches': 0,
-            'size_appropriate': subreddit.subscribers > 1000,
-            'public_community': subreddit.subreddit_type == 'public',
-            'content_related': False,
+        return {
+            'keyword_matches': keyword_matches,
+            'size_appropriate': subscribers > 1000,
+            'public_community': subreddit_type == 'public',
+            'content_related': keyword_matches > 0,
             'activity_level': 'unknown'
         }
-        
-        # Check for keyword matches
-        description = (subreddit.description or "").lower()
-        user_keywords = self._extract_keywords_from_subreddits(user_subreddits)
-        matches = sum(1 for keyword in user_keywords if keyword in description)
-        factors['keyword_matches'] = matches
-        factors['content_related'] = matches > 0
-        
-        return factors
     
     def discover_by_keywords(self, keywords, limit=20):
         """Discover subreddits by searching for keywords"""
@@ -218,6 +243,7 @@ class SubredditDiscovery:
             try:
                 # Search for subreddits
                 search_results = list(self.reddit.subreddits.search(keyword, limit=limit))
+                keyword_lower = keyword.lower()
                 
                 for subreddit in search_results:
                     discovered_subreddits.append({
@@ -229,7 +255,7 @@ class SubredditDiscovery:
                         'subreddit_type': subreddit.subreddit_type,
                         'over18': subreddit.over18,
                         'search_keyword': keyword,
-                        'relevance_score': self._calculate_keyword_relevance(subreddit, keyword)
+                        'relevance_score': self._calculate_keyword_relevance(subreddit, keyword_lower)
                     })
             
             except Exception as e:
@@ -239,24 +265,23 @@ class SubredditDiscovery:
         # Remove duplicates and sort by relevance
         unique_subreddits = {}
         for sub in discovered_subreddits:
-            name = sub['name']
-            if name not in unique_subreddits or sub['relevance_score'] > unique_subreddits[name]['relevance_score']:
-                unique_subreddits[name] = sub
+            best = unique_subreddits.get(sub['name'])
+            if best is None or sub['relevance_score'] > best['relevance_score']:
+                unique_subreddits[sub['name']] = sub
         
-        sorted_subreddits = sorted(unique_subreddits.values(), key=lambda x: x['relevance_score'], reverse=True)
-        return sorted_subreddits[:30]
+        return heapq.nlargest(30, unique_subreddits.values(), key=lambda x: x['relevance_score'])
     
-    def _calculate_keyword_relevance(self, subreddit, keyword):
-        """Calculate relevance score for keyword-based discovery"""
+    def _calculate_keyword_relevance(self, subreddit, keyword_lower):
+        """Calculate relevance score for keyword-based discovery (keyword must be lowercase)"""
         score = 1.0
         
         # Check if keyword appears in name
-        if keyword.lower() in subreddit.display_name.lower():
+        if keyword_lower in subreddit.display_name.lower():
             score *= 2.0
         
         # Check if keyword appears in description
         description = (subreddit.description or "").lower()
-        if keyword.lower() in description:
+        if keyword_lower in description:
             score *= 1.5
         
         # Factor in subscriber count
@@ -284,29 +309,26 @@ class SubredditDiscovery:
         unique_subreddits = {}
         
         for sub in all_subreddits:
-            name = sub['name']
-            if name not in unique_subreddits:
-                unique_subreddits[name] = sub
-            else:
-                # Keep the one with higher score
-                if sub.get('score', 0) > unique_subreddits[name].get('score', 0):
-                    unique_subreddits[name] = sub
+            # Keep the one with higher score
+            best = unique_subreddits.get(sub['name'])
+            if best is None or sub.get('score', 0) > best.get('score', 0):
+                unique_subreddits[sub['name']] = sub
         
-        # Sort by score
-        final_subreddits = sorted(unique_subreddits.values(), key=lambda x: x.get('score', 0), reverse=True)
+        # Top 20 by score (also covers the top 15 used for recommendations)
+        top_subreddits = heapq.nlargest(20, unique_subreddits.values(), key=lambda x: x.get('score', 0))
         
         # Generate report
         report = {
             'discovery_date': datetime.now(timezone.utc).isoformat(),
             'user_subreddits': user_subreddits,
-            'discovered_subreddits': final_subreddits[:20],  # Top 20
+            'discovered_subreddits': top_subreddits,
             'discovery_stats': {
-                'total_discovered': len(final_subreddits),
+                'total_discovered': len(unique_subreddits),
                 'related_discovered': len(related_subreddits),
                 'keyword_discovered': len(keyword_subreddits),
-                'high_confidence': len([s for s in final_subreddits if s.get('score', 0) > 1.0])
+                'high_confidence': sum(1 for s in unique_subreddits.values() if s.get('score', 0) > 1.0)
             },
-            'recommendations': self._generate_discovery_recommendations(final_subreddits)
+            'recommendations': self._generate_discovery_recommendations(top_subreddits)
         }
         
         return report
@@ -339,8 +361,12 @@ class SubredditDiscovery:
         # Ensure output directory exists
         os.makedirs('data', exist_ok=True)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
         
         print(f"💾 Discovery report saved to: {filename}")
         return filename
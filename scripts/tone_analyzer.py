@@ -9,93 +9,213 @@ import re
 import os
 from datetime import datetime, timezone
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import math
+import operator
+import weakref
 
-class ToneAnalyzer:
-    def __init__(self):
-        """Initialize tone analyzer"""
-        self.tone_indicators = self._load_tone_indicators()
-        self.writing_patterns = self._load_writing_patterns()
-        
-    def _load_tone_indicators(self):
-        """Load tone indicators and patterns"""
-        return {
-            'formal': {
-                'indicators': ['therefore', 'however', 'furthermore', 'consequently', 'moreover', 'nevertheless'],
-                'patterns': [r'\b(?:therefore|however|furthermore)\b', r'\b(?:consequently|moreover|nevertheless)\b']
-            },
-            'casual': {
-                'indicators': ['lol', 'haha', 'tbh', 'imo', 'ngl', 'fr', 'tbh', 'ngl'],
-                'patterns': [r'\b(?:lol|haha|tbh|imo|ngl|fr)\b', r'[!]{2,}', r'[?]{2,}']
-            },
-            'technical': {
-                'indicators': ['ph', 'acid', 'compound', 'molecule', 'formulation', 'concentration', 'percentage'],
-                'patterns': [r'\b(?:ph|acid|compound|molecule|formulation|concentration|percentage)\b']
-            },
-            'empathetic': {
-                'indicators': ['understand', 'feel', 'sorry', 'hope', 'wish', 'care', 'support'],
-                'patterns': [r'\b(?:understand|feel|sorry|hope|wish|care|support)\b']
-            },
-            'educational': {
-                'indicators': ['should', 'recommend', 'suggest', 'advise', 'consider', 'try', 'avoid'],
-                'patterns': [r'\b(?:should|recommend|suggest|advise|consider|try|avoid)\b']
-            },
-            'questioning': {
-                'indicators': ['what', 'how', 'why', 'when', 'where', 'which', '?'],
-                'patterns': [r'\b(?:what|how|why|when|where|which)\b', r'\?']
-            },
-            'enthusiastic': {
-                'indicators': ['love', 'amazing', 'great', 'awesome', 'fantastic', 'wonderful', '!'],
-                'patterns': [r'\b(?:love|amazing|great|awesome|fantastic|wonderful)\b', r'!{2,}']
-            },
-            'cautious': {
-                'indicators': ['maybe', 'perhaps', 'might', 'could', 'possibly', 'unclear', 'uncertain'],
-                'patterns': [r'\b(?:maybe|perhaps|might|could|possibly|unclear|uncertain)\b']
-            }
+# pyahocorasick is optional - it finds every tone indicator in a single pass
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# orjson is optional - it writes analysis files considerably faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson is optional - it streams comments from large activity files
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Sentence boundaries used by the sentence length and readability metrics
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Number of distinct comment texts whose tone/style results are kept
+ANALYSIS_CACHE_SIZE = 4096
+
+# Number of distinct (tone scores, sentence length) profiles kept
+PROFILE_CACHE_SIZE = 256
+
+# Below this many distinct comments a process pool costs more than it saves
+PARALLEL_MIN_COMMENTS = 500
+
+def _load_tone_indicators():
+    """Load tone indicators and compiled patterns
+    
+    'patterns' hold word-level regexes (fused by _build_tone_regex);
+    'symbol_patterns' hold punctuation regexes, which can overlap
+    between tones and are therefore matched separately.
+    """
+    tone_indicators = {
+        'formal': {
+            'indicators': ['therefore', 'however', 'furthermore', 'consequently', 'moreover', 'nevertheless'],
+            'patterns': [r'\b(?:therefore|however|furthermore)\b', r'\b(?:consequently|moreover|nevertheless)\b']
+        },
+        'casual': {
+            'indicators': ['lol', 'haha', 'tbh', 'imo', 'ngl', 'fr', 'tbh', 'ngl'],
+            'patterns': [r'\b(?:lol|haha|tbh|imo|ngl|fr)\b'],
+            'symbol_patterns': [r'[!]{2,}', r'[?]{2,}']
+        },
+        'technical': {
+            'indicators': ['ph', 'acid', 'compound', 'molecule', 'formulation', 'concentration', 'percentage'],
+            'patterns': [r'\b(?:ph|acid|compound|molecule|formulation|concentration|percentage)\b']
+        },
+        'empathetic': {
+            'indicators': ['understand', 'feel', 'sorry', 'hope', 'wish', 'care', 'support'],
+            'patterns': [r'\b(?:understand|feel|sorry|hope|wish|care|support)\b']
+        },
+        'educational': {
+            'indicators': ['should', 'recommend', 'suggest', 'advise', 'consider', 'try', 'avoid'],
+            'patterns': [r'\b(?:should|recommend|suggest|advise|consider|try|avoid)\b']
+        },
+        'questioning': {
+            'indicators': ['what', 'how', 'why', 'when', 'where', 'which', '?'],
+            'patterns': [r'\b(?:what|how|why|when|where|which)\b'],
+            'symbol_patterns': [r'\?']
+        },
+        'enthusiastic': {
+            'indicators': ['love', 'amazing', 'great', 'awesome', 'fantastic', 'wonderful', '!'],
+            'patterns': [r'\b(?:love|amazing|great|awesome|fantastic|wonderful)\b'],
+            'symbol_patterns': [r'!{2,}']
+        },
+        'cautious': {
+            'indicators': ['maybe', 'perhaps', 'might', 'could', 'possibly', 'unclear', 'uncertain'],
+            'patterns': [r'\b(?:maybe|perhaps|might|could|possibly|unclear|uncertain)\b']
         }
+    }
     
-    def _load_writing_patterns(self):
-        """Load writing style patterns"""
-        return {
-            'sentence_length': {
-                'short': {'max_words': 10, 'weight': 1.0},
-                'medium': {'min_words': 11, 'max_words': 25, 'weight': 1.0},
-                'long': {'min_words': 26, 'weight': 1.0}
-            },
-            'punctuation': {
-                'exclamation': {'pattern': r'!', 'weight': 1.0},
-                'question': {'pattern': r'\?', 'weight': 1.0},
-                'ellipsis': {'pattern': r'\.{3,}', 'weight': 1.0},
-                'caps': {'pattern': r'[A-Z]{3,}', 'weight': 1.0}
-            },
-            'structure': {
-                'lists': {'pattern': r'^\s*[-*•]\s', 'weight': 1.0},
-                'numbered': {'pattern': r'^\s*\d+\.\s', 'weight': 1.0},
-                'paragraphs': {'pattern': r'\n\s*\n', 'weight': 1.0}
-            }
+    for data in tone_indicators.values():
+        data['patterns'] = [re.compile(pattern, re.IGNORECASE) for pattern in data['patterns']]
+        data['symbol_patterns'] = [re.compile(pattern) for pattern in data.get('symbol_patterns', [])]
+    
+    return tone_indicators
+
+def _load_writing_patterns():
+    """Load writing style patterns (punctuation/structure patterns are compiled)"""
+    writing_patterns = {
+        'sentence_length': {
+            'short': {'max_words': 10, 'weight': 1.0},
+            'medium': {'min_words': 11, 'max_words': 25, 'weight': 1.0},
+            'long': {'min_words': 26, 'weight': 1.0}
+        },
+        'punctuation': {
+            'exclamation': {'char': '!', 'weight': 1.0},
+            'question': {'char': '?', 'weight': 1.0},
+            'ellipsis': {'pattern': r'\.{3,}', 'weight': 1.0},
+            'caps': {'pattern': r'[A-Z]{3,}', 'weight': 1.0}
+        },
+        'structure': {
+            'lists': {'pattern': r'^\s*[-*•]\s', 'weight': 1.0},
+            'numbered': {'pattern': r'^\s*\d+\.\s', 'weight': 1.0},
+            'paragraphs': {'pattern': r'\n\s*\n', 'weight': 1.0}
         }
+    }
+    
+    # Single characters ('char') are counted with str.count, no regex needed
+    for data in writing_patterns['punctuation'].values():
+        if 'pattern' in data:
+            data['pattern'] = re.compile(data['pattern'])
+    for data in writing_patterns['structure'].values():
+        data['pattern'] = re.compile(data['pattern'], re.MULTILINE)
+    
+    return writing_patterns
+
+def _build_tone_regex(tone_indicators):
+    """Fuse all tone word patterns into one regex with a named group per tone"""
+    return re.compile('|'.join(
+        f"(?P<{tone}>{'|'.join(pattern.pattern for pattern in data['patterns'])})"
+        for tone, data in tone_indicators.items()
+    ), re.IGNORECASE)
+
+def _build_indicator_weights(tone_indicators):
+    """Map each indicator to the tones it scores, counting repeated list entries"""
+    indicator_weights = defaultdict(Counter)
+    for tone, data in tone_indicators.items():
+        for indicator in data['indicators']:
+            indicator_weights[indicator][tone] += 1
+    return dict(indicator_weights)
+
+def _build_indicator_automaton(indicator_weights):
+    """Build an Aho-Corasick automaton over all indicators (None without pyahocorasick)"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for indicator in indicator_weights:
+        automaton.add_word(indicator, indicator)
+    automaton.make_automaton()
+    return automaton
+
+# Lookup tables and compiled matchers, built once at import and shared
+# (read-only) by every ToneAnalyzer
+TONE_INDICATORS = _load_tone_indicators()
+WRITING_PATTERNS = _load_writing_patterns()
+TONE_REGEX = _build_tone_regex(TONE_INDICATORS)
+INDICATOR_WEIGHTS = _build_indicator_weights(TONE_INDICATORS)
+INDICATOR_AUTOMATON = _build_indicator_automaton(INDICATOR_WEIGHTS)
+
+class ToneAnalyzer:
+    def __init__(self):
+        """Initialize tone analyzer"""
+        self.tone_indicators = TONE_INDICATORS
+        self.writing_patterns = WRITING_PATTERNS
+        self.tone_regex = TONE_REGEX
+        self.indicator_weights = INDICATOR_WEIGHTS
+        self.indicator_automaton = INDICATOR_AUTOMATON
+        
+        # Identical comments (canned replies, reposts) are only analyzed once.
+        # The caches call through a weak proxy: caching bound methods would tie
+        # the analyzer and every cached text into a reference cycle.
+        analyzer = weakref.proxy(self)
+        self._cached_comment_tone = lru_cache(maxsize=ANALYSIS_CACHE_SIZE)(partial(ToneAnalyzer._analyze_comment_tone, analyzer))
+        self._cached_writing_style = lru_cache(maxsize=ANALYSIS_CACHE_SIZE)(partial(ToneAnalyzer._analyze_writing_style, analyzer))
+        self._cached_tone_profile = lru_cache(maxsize=PROFILE_CACHE_SIZE)(partial(ToneAnalyzer._build_tone_profile, analyzer))
+        
+    def _find_indicators(self, text):
+        """Return the set of indicators that occur anywhere in text"""
+        if self.indicator_automaton is not None:
+            return {indicator for _, indicator in self.indicator_automaton.iter(text)}
+        return {indicator for indicator in self.indicator_weights if indicator in text}
     
     def analyze_comment_tone(self, comment_text):
+        """Analyze tone of a single comment"""
+        # Copy so callers can't alter the cached result shared by identical comments
+        return dict(self._cached_comment_tone(comment_text))
+    
+    def _analyze_comment_tone(self, comment_text):
         """Analyze tone of a single comment"""
         if not comment_text:
             return {}
         
         text = comment_text.lower()
-        tone_scores = defaultdict(float)
+        tone_scores = {}
+        
+        # Match every tone's word patterns in a single pass
+        pattern_matches = Counter(match.lastgroup for match in self.tone_regex.finditer(text))
+        
+        # Find every indicator in a single pass
+        indicator_matches = Counter()
+        for indicator in self._find_indicators(text):
+            indicator_matches.update(self.indicator_weights[indicator])
         
         # Analyze tone indicators
         for tone, data in self.tone_indicators.items():
-            score = 0
-            
-            # Check indicators
-            for indicator in data['indicators']:
-                if indicator in text:
-                    score += 1
+            score = indicator_matches[tone]
             
             # Check patterns
-            for pattern in data['patterns']:
-                matches = len(re.findall(pattern, text, re.IGNORECASE))
-                score += matches * 0.5
+            matches = pattern_matches[tone]
+            for pattern in data['symbol_patterns']:
+                matches += sum(1 for _ in pattern.finditer(text))
+            score += matches * 0.5
             
             tone_scores[tone] = score
         
@@ -104,38 +224,65 @@ class ToneAnalyzer:
         if total_score > 0:
             tone_scores = {tone: score / total_score for tone, score in tone_scores.items()}
         
-        return dict(tone_scores)
+        return tone_scores
     
     def analyze_writing_style(self, comment_text):
+        """Analyze writing style characteristics"""
+        # Copy every nested level so callers can't alter the cached result
+        style = self._cached_writing_style(comment_text)
+        if not style:
+            return {}
+        
+        sentence_length = style['sentence_length']
+        return {
+            'sentence_length': dict(sentence_length, distribution=dict(sentence_length['distribution'])),
+            'punctuation': {punct_type: dict(data) for punct_type, data in style['punctuation'].items()},
+            'structure': {struct_type: dict(data) for struct_type, data in style['structure'].items()},
+            'readability': dict(style['readability'])
+        }
+    
+    def _analyze_writing_style(self, comment_text):
         """Analyze writing style characteristics"""
         if not comment_text:
             return {}
         
+        # Tokenize once and share the result across all metrics
+        sentences = SENTENCE_SPLIT_RE.split(comment_text)
+        words = comment_text.split()
+        
         style_analysis = {
-            'sentence_length': self._analyze_sentence_length(comment_text),
-            'punctuation': self._analyze_punctuation(comment_text),
+            'sentence_length': self._analyze_sentence_length(sentences),
+            'punctuation': self._analyze_punctuation(comment_text, words),
             'structure': self._analyze_structure(comment_text),
-            'readability': self._calculate_readability(comment_text)
+            'readability': self._calculate_readability(sentences, words)
         }
         
         return style_analysis
     
-    def _analyze_sentence_length(self, text):
-        """Analyze sentence length patterns"""
-        sentences = re.split(r'[.!?]+', text)
-        sentence_lengths = [len(sentence.split()) for sentence in sentences if sentence.strip()]
-        
-        if not sentence_lengths:
+    def _analyze_sentence_length(self, sentences):
+        """Analyze sentence length patterns from pre-split sentences"""
+        # Count words and categorize by length in a single pass
+        total = total_words = 0
+        short_count = medium_count = long_count = 0
+        
+        for sentence in sentences:
+            word_count = len(sentence.split())
+            if not word_count:
+                continue
+            
+            total += 1
+            total_words += word_count
+            if word_count <= 10:
+                short_count += 1
+            elif word_count <= 25:
+                medium_count += 1
+            else:
+                long_count += 1
+        
+        if not total:
             return {'avg_length': 0, 'distribution': {}}
         
-        avg_length = sum(sentence_lengths) / len(sentence_lengths)
-        
-        # Categorize by length
-        short_count = len([l for l in sentence_lengths if l <= 10])
-        medium_count = len([l for l in sentence_lengths if 11 <= l <= 25])
-        long_count = len([l for l in sentence_lengths if l > 25])
-        
-        total = len(sentence_lengths)
+        avg_length = total_words / total
         
         return {
             'avg_length': round(avg_length, 2),
@@ -146,16 +293,19 @@ class ToneAnalyzer:
             }
         }
     
-    def _analyze_punctuation(self, text):
-        """Analyze punctuation usage"""
+    def _analyze_punctuation(self, text, words):
+        """Analyze punctuation usage (words is text.split())"""
         punctuation_analysis = {}
+        word_count = len(words)
         
         for punct_type, data in self.writing_patterns['punctuation'].items():
-            pattern = data['pattern']
-            matches = len(re.findall(pattern, text))
+            if 'char' in data:
+                matches = text.count(data['char'])
+            else:
+                matches = sum(1 for _ in data['pattern'].finditer(text))
             punctuation_analysis[punct_type] = {
                 'count': matches,
-                'density': round(matches / len(text.split()), 3) if text.split() else 0
+                'density': round(matches / word_count, 3) if word_count else 0
             }
         
         return punctuation_analysis
@@ -165,8 +315,7 @@ class ToneAnalyzer:
         structure_analysis = {}
         
         for struct_type, data in self.writing_patterns['structure'].items():
-            pattern = data['pattern']
-            matches = len(re.findall(pattern, text, re.MULTILINE))
+            matches = sum(1 for _ in data['pattern'].finditer(text))
             structure_analysis[struct_type] = {
                 'count': matches,
                 'has_structure': matches > 0
@@ -174,16 +323,13 @@ class ToneAnalyzer:
         
         return structure_analysis
     
-    def _calculate_readability(self, text):
-        """Calculate basic readability score"""
-        sentences = re.split(r'[.!?]+', text)
-        words = text.split()
-        
+    def _calculate_readability(self, sentences, words):
+        """Calculate basic readability score from pre-split sentences and words"""
         if not sentences or not words:
             return {'score': 0, 'level': 'unknown'}
         
         avg_sentence_length = len(words) / len(sentences)
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        avg_word_length = len(''.join(words)) / len(words)
         
         # Simple readability formula
         readability_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_word_length)
@@ -207,30 +353,45 @@ class ToneAnalyzer:
         }
     
     def analyze_user_tone(self, comments):
-        """Analyze overall tone from user's comments"""
-        print(f"🎭 Analyzing tone from {len(comments)} comments...")
-        
-        if not comments:
-            return {}
+        """Analyze overall tone from user's comments (a list or a one-shot iterable)"""
+        comment_count = len(comments) if hasattr(comments, '__len__') else 'streamed'
+        print(f"🎭 Analyzing tone from {comment_count} comments...")
         
-        # Analyze each comment
-        comment_tones = []
-        comment_styles = []
+        # Collect comment texts
+        comments_seen = 0
+        comment_texts = []
         
         for comment in comments:
+            comments_seen += 1
             comment_text = comment.get('comment_text', '')
             if comment_text:
-                tone = self.analyze_comment_tone(comment_text)
-                style = self.analyze_writing_style(comment_text)
-                
-                comment_tones.append(tone)
-                comment_styles.append(style)
+                comment_texts.append(comment_text)
+        
+        if not comments_seen:
+            return {}
+        
+        # Accumulate per-comment features column by column instead of keeping every result dict
+        tone_totals = Counter()
+        sentence_lengths = []
+        readability_scores = []
+        punctuation_totals = Counter()
+        
+        for tone, style in self._analyze_comments(comment_texts):
+            tone_totals.update(tone)
+            if style.get('sentence_length'):
+                sentence_lengths.append(style['sentence_length']['avg_length'])
+            if style.get('readability'):
+                readability_scores.append(style['readability']['score'])
+            if 'punctuation' in style:
+                punctuation_totals.update({punct_type: data['count'] for punct_type, data in style['punctuation'].items()})
         
         # Aggregate tone analysis
-        aggregated_tone = self._aggregate_tone_scores(comment_tones)
+        aggregated_tone = self._aggregate_tone_scores(tone_totals, len(comment_texts))
         
         # Aggregate style analysis
-        aggregated_style = self._aggregate_style_analysis(comment_styles)
+        aggregated_style = self._aggregate_style_analysis(
+            sentence_lengths, readability_scores, punctuation_totals, len(comment_texts)
+        )
         
         # Generate tone profile
         tone_profile = self._generate_tone_profile(aggregated_tone, aggregated_style)
@@ -240,68 +401,59 @@ class ToneAnalyzer:
             'writing_style': aggregated_style,
             'tone_profile': tone_profile,
             'analysis_metadata': {
-                'comments_analyzed': len(comment_tones),
+                'comments_analyzed': len(comment_texts),
                 'analysis_date': datetime.now(timezone.utc).isoformat()
             }
         }
     
-    def _aggregate_tone_scores(self, comment_tones):
-        """Aggregate tone scores across all comments"""
-        if not comment_tones:
-            return {}
+    def _analyze_comments(self, comment_texts):
+        """Return (tone, style) for each comment text, using a process pool for large histories"""
+        unique_texts = list(dict.fromkeys(comment_texts))
         
-        # Sum all tone scores
-        total_scores = defaultdict(float)
-        for tone_scores in comment_tones:
-            for tone, score in tone_scores.items():
-                total_scores[tone] += score
+        if len(unique_texts) < PARALLEL_MIN_COMMENTS or (os.cpu_count() or 1) < 2:
+            return [(self._cached_comment_tone(text), self._cached_writing_style(text)) for text in comment_texts]
         
-        # Normalize by number of comments
-        num_comments = len(comment_tones)
-        normalized_scores = {tone: score / num_comments for tone, score in total_scores.items()}
+        # Workers use their process-wide shared analyzer; only texts and result dicts are pickled
+        with ProcessPoolExecutor() as executor:
+            results = dict(zip(unique_texts, executor.map(_analyze_comment_in_worker, unique_texts, chunksize=64)))
         
-        return normalized_scores
+        return [results[text] for text in comment_texts]
     
-    def _aggregate_style_analysis(self, comment_styles):
-        """Aggregate style analysis across all comments"""
-        if not comment_styles:
+    def _aggregate_tone_scores(self, total_scores, num_comments):
+        """Normalize summed tone scores by the number of comments"""
+        if not num_comments:
             return {}
         
-        # Aggregate sentence length
-        all_lengths = [style['sentence_length']['avg_length'] for style in comment_styles if style.get('sentence_length')]
-        avg_sentence_length = sum(all_lengths) / len(all_lengths) if all_lengths else 0
+        normalized_scores = {tone: score / num_comments for tone, score in total_scores.items()}
         
-        # Aggregate readability
-        all_readability = [style['readability']['score'] for style in comment_styles if style.get('readability')]
-        avg_readability = sum(all_readability) / len(all_readability) if all_readability else 0
+        return normalized_scores
+    
+    def _aggregate_style_analysis(self, sentence_lengths, readability_scores, punctuation_totals, num_comments):
+        """Aggregate style features accumulated across all comments"""
+        if not num_comments:
+            return {}
         
-        # Aggregate punctuation usage
-        punctuation_totals = defaultdict(int)
-        for style in comment_styles:
-            if 'punctuation' in style:
-                for punct_type, data in style['punctuation'].items():
-                    punctuation_totals[punct_type] += data['count']
+        avg_sentence_length = sum(sentence_lengths) / len(sentence_lengths) if sentence_lengths else 0
+        avg_readability = sum(readability_scores) / len(readability_scores) if readability_scores else 0
         
         return {
             'avg_sentence_length': round(avg_sentence_length, 2),
             'avg_readability': round(avg_readability, 2),
             'punctuation_usage': dict(punctuation_totals),
-            'writing_consistency': self._calculate_consistency(comment_styles)
+            'writing_consistency': self._calculate_consistency(sentence_lengths)
         }
     
-    def _calculate_consistency(self, comment_styles):
-        """Calculate writing consistency across comments"""
-        if len(comment_styles) < 2:
-            return {'score': 1.0, 'level': 'consistent'}
-        
+    def _calculate_consistency(self, lengths):
+        """Calculate writing consistency from per-comment average sentence lengths"""
         # Calculate variance in sentence length
-        lengths = [style['sentence_length']['avg_length'] for style in comment_styles if style.get('sentence_length')]
         if len(lengths) < 2:
             return {'score': 1.0, 'level': 'consistent'}
         
-        mean_length = sum(lengths) / len(lengths)
-        variance = sum((x - mean_length) ** 2 for x in lengths) / len(lengths)
-        std_dev = math.sqrt(variance)
+        # Mean and population variance from C-level sums (E[x^2] - E[x]^2)
+        count = len(lengths)
+        mean_length = math.fsum(lengths) / count
+        mean_square = math.fsum(map(operator.mul, lengths, lengths)) / count
+        std_dev = math.sqrt(max(0.0, mean_square - mean_length * mean_length))
         
         # Consistency score (lower std dev = more consistent)
         consistency_score = max(0, 1 - (std_dev / mean_length)) if mean_length > 0 else 1
@@ -322,16 +474,27 @@ class ToneAnalyzer:
         }
     
     def _generate_tone_profile(self, tone_scores, style_analysis):
-        """Generate comprehensive tone profile"""
+        """Generate comprehensive tone profile (repeat analyses of the same scores reuse it)"""
+        # Items keep their insertion order so ties between tones resolve as before
+        profile = self._cached_tone_profile(
+            tuple(tone_scores.items()), style_analysis.get('avg_sentence_length', 0)
+        )
+        
+        # The profile is stored in the analysis output, so hand out a copy
+        return dict(profile, dominant_tones=list(profile['dominant_tones']))
+    
+    def _build_tone_profile(self, tone_items, avg_length):
+        """Build the tone profile from (tone, score) items and average sentence length"""
+        tone_scores = dict(tone_items)
+        
         # Find dominant tones
-        sorted_tones = sorted(tone_scores.items(), key=lambda x: x[1], reverse=True)
+        sorted_tones = sorted(tone_items, key=lambda x: x[1], reverse=True)
         dominant_tones = [tone for tone, score in sorted_tones if score > 0.1]
         
         # Determine primary tone
         primary_tone = sorted_tones[0][0] if sorted_tones else 'neutral'
         
         # Determine writing style
-        avg_length = style_analysis.get('avg_sentence_length', 0)
         if avg_length < 10:
             writing_style = 'concise'
         elif avg_length > 20:
@@ -407,12 +570,41 @@ class ToneAnalyzer:
         os.makedirs('data/tone_analysis', exist_ok=True)
         
         filename = f"data/tone_analysis/{username}_tone_analysis.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(analysis, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(analysis, f, indent=2, ensure_ascii=False)
         
         print(f"💾 Tone analysis saved to: {filename}")
         return filename
 
+# Process-wide analyzer, created on first use by get_tone_analyzer()
+_shared_analyzer = None
+
+def get_tone_analyzer():
+    """Return the shared ToneAnalyzer so repeated analyses reuse its result caches"""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = ToneAnalyzer()
+    return _shared_analyzer
+
+def _analyze_comment_in_worker(comment_text):
+    """Analyze one comment inside a pool worker"""
+    analyzer = get_tone_analyzer()
+    return analyzer._cached_comment_tone(comment_text), analyzer._cached_writing_style(comment_text)
+
+def iter_recent_comments(comments_file):
+    """Yield recent comments from an activity file, streaming with ijson when available"""
+    if IJSON_AVAILABLE:
+        with open(comments_file, 'rb') as f:
+            yield from ijson.items(f, 'recent_comments.item')
+    else:
+        with open(comments_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data.get('recent_comments', [])
+
 def main():
     """Main function for testing"""
     import sys
@@ -426,17 +618,15 @@ def main():
     comments_file = sys.argv[2] if len(sys.argv) > 2 else None
     
     try:
-        # Load comments
+        # Load comments (streamed lazily into analyze_user_tone)
         if comments_file and os.path.exists(comments_file):
-            with open(comments_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            comments = data.get('recent_comments', [])
+            comments = iter_recent_comments(comments_file)
         else:
             print("❌ Comments file not found, using sample data")
             comments = []
         
         # Initialize analyzer
-        analyzer = ToneAnalyzer()
+        analyzer = get_tone_analyzer()
         
         # Analyze tone
         tone_analysis = analyzer.analyze_user_tone(comments)